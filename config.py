@@ -3,9 +3,29 @@
 import os
 from pathlib import Path
 
+_env = os.environ
+_TRUTHY = frozenset(("1", "true", "yes"))
+
+
+def _env_bool(key: str, default: bool) -> bool:
+    """Read a boolean flag from the environment (1/true/yes, case-insensitive)."""
+    value = _env.get(key)
+    if value is None:
+        return default
+    return value.lower() in _TRUTHY
+
+
+def _env_int(key: str, default: int) -> int:
+    """Read an integer from the environment, falling back to default if unset or malformed."""
+    try:
+        return int(_env.get(key, ""))
+    except ValueError:
+        return default
+
+
 # ============== 数据存储目录配置 ==============
 # Render Disk 挂载路径，本地开发时使用项目根目录下的 data/
-DATA_DIR = Path(os.environ.get("DATA_DIR", Path(__file__).parent / "data"))
+DATA_DIR = Path(_env.get("DATA_DIR", Path(__file__).parent / "data"))
 try:
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 except PermissionError:
@@ -14,22 +34,22 @@ except PermissionError:
 
 # ============== Auth / 用户配置 ==============
 # SQLite 数据库路径（默认放在 DATA_DIR 下）
-DB_PATH = Path(os.environ.get("DB_PATH", str(DATA_DIR / "app.db")))
+DB_PATH = Path(_env.get("DB_PATH", str(DATA_DIR / "app.db")))
 
 # Email verification token 有效期（小时）
-try:
-    EMAIL_VERIFY_TTL_HOURS = int(os.environ.get("EMAIL_VERIFY_TTL_HOURS", "24"))
-except ValueError:
-    EMAIL_VERIFY_TTL_HOURS = 24
+EMAIL_VERIFY_TTL_HOURS = _env_int("EMAIL_VERIFY_TTL_HOURS", 24)
 
 # ============== 企业微信错误通知 ==============
 # WeChat Work webhook URL for error notifications
-WECHAT_WEBHOOK_URL = os.environ.get("WECHAT_WEBHOOK_URL", "")
+WECHAT_WEBHOOK_URL = _env.get("WECHAT_WEBHOOK_URL", "")
 
 # ============== 管理员配置 ==============
 # Admin emails (comma-separated list)
-_admin_emails_raw = os.environ.get("ADMIN_EMAILS", "")
-ADMIN_EMAILS = [email.strip().lower() for email in _admin_emails_raw.split(",") if email.strip()]
+_admin_emails_raw = _env.get("ADMIN_EMAILS", "")
+# frozenset: is_admin() only does membership tests
+ADMIN_EMAILS: frozenset[str] = frozenset(
+    email.strip().lower() for email in _admin_emails_raw.split(",") if email.strip()
+)
 
 # 默认管理员邮箱（如果环境变量未设置）
 DEFAULT_ADMIN_EMAILS = [
@@ -38,7 +58,7 @@ DEFAULT_ADMIN_EMAILS = [
 
 # 合并环境变量和默认管理员
 if not ADMIN_EMAILS and DEFAULT_ADMIN_EMAILS:
-    ADMIN_EMAILS = [email.strip().lower() for email in DEFAULT_ADMIN_EMAILS]
+    ADMIN_EMAILS = frozenset(email.strip().lower() for email in DEFAULT_ADMIN_EMAILS)
 
 def is_admin(email: str) -> bool:
     """Check if an email belongs to an admin user."""
@@ -48,32 +68,32 @@ def is_admin(email: str) -> bool:
 
 # ============== 邮件生成模型配置 ==============
 # 全局开关：使用 OpenAI 作为所有 LLM 调用的后端（默认 true，因为 Gemini 配额用尽）
-USE_OPENAI_AS_PRIMARY = os.environ.get("USE_OPENAI_AS_PRIMARY", "true").lower() in ("1", "true", "yes")
+USE_OPENAI_AS_PRIMARY = _env_bool("USE_OPENAI_AS_PRIMARY", True)
 
 # 使用 OpenAI 还是 Gemini 生成邮件（默认使用 OpenAI GPT-4o）
-USE_OPENAI_FOR_EMAIL = os.environ.get("USE_OPENAI_FOR_EMAIL", "true").lower() in ("1", "true", "yes")
+USE_OPENAI_FOR_EMAIL = _env_bool("USE_OPENAI_FOR_EMAIL", True)
 
 # OpenAI 邮件生成模型
-OPENAI_EMAIL_MODEL = os.environ.get("OPENAI_EMAIL_MODEL", "gpt-4o")
+OPENAI_EMAIL_MODEL = _env.get("OPENAI_EMAIL_MODEL", "gpt-4o")
 
 # OpenAI 通用模型（用于 profile 解析、问卷生成等）
-OPENAI_DEFAULT_MODEL = os.environ.get("OPENAI_DEFAULT_MODEL", "gpt-4o")
+OPENAI_DEFAULT_MODEL = _env.get("OPENAI_DEFAULT_MODEL", "gpt-4o")
 
 # Default Gemini model (can be overridden via env)
-DEFAULT_MODEL = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
+DEFAULT_MODEL = _env.get("GEMINI_MODEL", "gemini-2.0-flash")
 
 # Gemini model for recommendations with Google Search grounding
-GEMINI_SEARCH_MODEL = os.environ.get("GEMINI_SEARCH_MODEL", "gemini-2.0-flash")
+GEMINI_SEARCH_MODEL = _env.get("GEMINI_SEARCH_MODEL", "gemini-2.0-flash")
 
 # Toggle Gemini Google Search grounding for recommendations - DISABLED (Gemini quota exceeded)
-USE_GEMINI_SEARCH = os.environ.get("USE_GEMINI_SEARCH", "false").lower() in ("1", "true", "yes")
+USE_GEMINI_SEARCH = _env_bool("USE_GEMINI_SEARCH", False)
 
 # Default model for recommendations (OpenAI) - disabled by default due to web_search incompatibility
-RECOMMENDATION_MODEL = os.environ.get("OPENAI_RECOMMENDATION_MODEL", "gpt-4o")
+RECOMMENDATION_MODEL = _env.get("OPENAI_RECOMMENDATION_MODEL", "gpt-4o")
 
 # Toggle OpenAI built-in web_search for recommendations - DISABLED by default
 # OpenAI API does not support 'web_search' tool type, causes errors
-USE_OPENAI_WEB_SEARCH = os.environ.get("USE_OPENAI_WEB_SEARCH", "false").lower() in ("1", "true", "yes")
+USE_OPENAI_WEB_SEARCH = _env_bool("USE_OPENAI_WEB_SEARCH", False)
 
 # Toggle using OpenAI for recommendations at all (fallback uses Gemini)
-USE_OPENAI_RECOMMENDATIONS = os.environ.get("USE_OPENAI_RECOMMENDATIONS", "true").lower() in ("1", "true", "yes")
+USE_OPENAI_RECOMMENDATIONS = _env_bool("USE_OPENAI_RECOMMENDATIONS", True)
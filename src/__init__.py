@@ -1,14 +1,19 @@
 """Honest Connect Email Agent package."""
 
-from .email_agent import (
-    ReceiverProfile,
-    SenderProfile,
-    build_prompt,
-    extract_profile_from_pdf,
-    extract_profile_from_text,
-    extract_text_from_pdf,
-    generate_email,
-)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .email_agent import (
+        ReceiverProfile,
+        SenderProfile,
+        build_prompt,
+        extract_profile_from_pdf,
+        extract_profile_from_text,
+        extract_text_from_pdf,
+        generate_email,
+    )
 
 __all__ = [
     "SenderProfile",
@@ -19,3 +24,14 @@ __all__ = [
     "extract_profile_from_text",
     "extract_profile_from_pdf",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve the email_agent re-exports on first access so importing a
+    # submodule (src.cli, src.models, src.services.*) does not pull in the
+    # LLM SDKs that email_agent loads at import time.
+    if name in __all__:
+        from . import email_agent
+
+        return getattr(email_agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
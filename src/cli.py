@@ -3,7 +3,6 @@ from __future__ import annotations
 import argparse
 from pathlib import Path
 
-from .email_agent import ReceiverProfile, SenderProfile, generate_email
 from config import DEFAULT_MODEL
 
 
@@ -55,6 +54,9 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     args = parse_args()
 
+    # Deferred so `--help` and argument errors don't import the LLM/PDF stack.
+    from .email_agent import ReceiverProfile, SenderProfile, generate_email
+
     if args.sender_pdf and (not args.motivation or not args.ask):
         raise SystemExit("--motivation and --ask are required when using --sender-pdf")
 
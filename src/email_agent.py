@@ -5,7 +5,7 @@ import logging
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +21,14 @@ try:
 except ModuleNotFoundError:  # pragma: no cover
     genai_new = None  # type: ignore
     genai_types = None  # type: ignore
-from openai import OpenAI
-from PyPDF2 import PdfReader
+
+# Optional faster JSON decoder; orjson.JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None  # type: ignore
+_json_loads = orjson.loads if orjson is not None else json.loads
+
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from config import (
@@ -38,6 +44,8 @@ from config import (
     OPENAI_DEFAULT_MODEL,
 )
 
+from src.services import openai_chat
+
 # Prompt 数据收集 (可选)
 try:
     from src.services.prompt_collector import prompt_collector
@@ -46,7 +54,7 @@ except ImportError:
     PROMPT_COLLECTOR_AVAILABLE = False
     prompt_collector = None
 
-@dataclass
+@dataclass(slots=True)
 class ProfileBase:
     name: str
     raw_text: str
@@ -56,7 +64,7 @@ class ProfileBase:
     projects: list[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class SenderProfile(ProfileBase):
     motivation: str
     ask: str
@@ -102,7 +110,7 @@ class SenderProfile(ProfileBase):
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class ReceiverProfile(ProfileBase):
     context: str | None = None
     sources: list[str] | None = None  # Web sources if scraped from internet
@@ -184,9 +192,9 @@ class ReceiverProfile(ProfileBase):
 
 
 def _load_json(path: Path) -> dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
+    with path.open("rb") as f:
         try:
-            return json.load(f)
+            return _json_loads(f.read())
         except json.JSONDecodeError as exc:
             raise ValueError(f"Failed to parse JSON in {path}: {exc}") from exc
 
@@ -206,21 +214,19 @@ def _load_str_list(data: dict[str, Any], key: str, source: Path | str) -> list[s
         return []
     if not isinstance(value, list):
         raise ValueError(f"Field '{key}' must be a list of strings in {source}")
-    cleaned: list[str] = []
-    for item in value:
-        if isinstance(item, str) and item.strip():
-            cleaned.append(item.strip())
-    return cleaned
+    return [item.strip() for item in value if isinstance(item, str) and item.strip()]
 
 
 def extract_text_from_pdf(pdf_path: Path) -> str:
+    # Imported lazily: PyPDF2 is only needed for PDF uploads, not JSON/CLI paths.
+    from PyPDF2 import PdfReader
+
     reader = PdfReader(str(pdf_path))
-    pages_text = [page.extract_text() or "" for page in reader.pages]
-    combined = "\n".join(text.strip() for text in pages_text if text and text.strip())
-    cleaned = combined.strip()
-    if not cleaned:
+    stripped_pages = ((page.extract_text() or "").strip() for page in reader.pages)
+    combined = "\n".join(text for text in stripped_pages if text)
+    if not combined:
         raise ValueError(f"No extractable text found in PDF {pdf_path}")
-    return cleaned
+    return combined
 
 
 def _validate_linkedin_url(url: str | None, grounding_urls: list[str] | None = None) -> str | None:
@@ -351,64 +357,20 @@ def _call_llm(prompt: str, *, json_mode: bool = False, model: str | None = None)
             return _call_openai_json(prompt, model=actual_model)
         else:
             # For non-JSON mode, use chat with a generic system prompt
-            client = _get_openai_client()
-            response = client.chat.completions.create(
-                model=actual_model,
-                messages=[
+            return openai_chat.chat_completion(
+                actual_model,
+                [
                     {"role": "system", "content": "You are a helpful assistant."},
                     {"role": "user", "content": prompt},
                 ],
                 temperature=0.7,
             )
-            content = response.choices[0].message.content
-            if not content:
-                raise RuntimeError("OpenAI response did not contain any content")
-            return content
     else:
         # Use Gemini
         actual_model = model or DEFAULT_MODEL
         return _call_gemini(prompt, model=actual_model, json_mode=json_mode)
 
 
-def _extract_json_from_text(text: str) -> str:
-    """
-    Extract JSON from text that may contain markdown code blocks or other content.
-    """
-    import re
-    
-    # Try to find JSON in markdown code blocks
-    json_block_pattern = r'```(?:json)?\s*\n?([\s\S]*?)\n?```'
-    matches = re.findall(json_block_pattern, text)
-    if matches:
-        for match in matches:
-            try:
-                json.loads(match.strip())
-                return match.strip()
-            except json.JSONDecodeError:
-                continue
-    
-    # Try to find raw JSON object
-    # Look for outermost { ... }
-    brace_start = text.find('{')
-    if brace_start != -1:
-        depth = 0
-        for i, char in enumerate(text[brace_start:], brace_start):
-            if char == '{':
-                depth += 1
-            elif char == '}':
-                depth -= 1
-                if depth == 0:
-                    try:
-                        candidate = text[brace_start:i+1]
-                        json.loads(candidate)
-                        return candidate
-                    except json.JSONDecodeError:
-                        continue
-    
-    # Return original text if no JSON found
-    return text
-
-
 def _call_gemini_with_search(prompt: str, *, model: str = GEMINI_SEARCH_MODEL, json_mode: bool = False, return_grounding_urls: bool = False) -> str | tuple[str, list[str]]:
     """
     Call Gemini API with Google Search grounding enabled using the new google-genai package.
@@ -458,7 +420,7 @@ def _call_gemini_with_search(prompt: str, *, model: str = GEMINI_SEARCH_MODEL, j
     # Extract JSON if requested
     result_text = response.text
     if json_mode:
-        result_text = _extract_json_from_text(response.text)
+        result_text = openai_chat.extract_json_from_text(response.text)
     
     if return_grounding_urls:
         grounding_urls = []
@@ -491,13 +453,6 @@ def _call_gemini_with_search(prompt: str, *, model: str = GEMINI_SEARCH_MODEL, j
     return result_text
 
 
-def _get_openai_client() -> OpenAI:
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable is required for OpenAI models")
-    return OpenAI(api_key=api_key)
-
-
 def _call_openai_chat(
     system_content: str,
     user_content: str,
@@ -517,47 +472,35 @@ def _call_openai_chat(
     Returns:
         Generated text response
     """
-    client = _get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return openai_chat.chat_completion(
+        model,
+        [
             {"role": "system", "content": system_content},
             {"role": "user", "content": user_content},
         ],
         temperature=temperature,
     )
-    content = response.choices[0].message.content
-    if not content:
-        raise RuntimeError("OpenAI response did not contain any content")
-    return content
 
 
 def _call_openai_json(prompt: str, *, model: str) -> str:
     """Call OpenAI chat completion and return the response text."""
-    client = _get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return openai_chat.json_completion(
+        model,
+        [
             {"role": "system", "content": "You are a concise assistant that returns strict JSON only."},
             {"role": "user", "content": prompt},
         ],
         temperature=0.4,
-        response_format={"type": "json_object"},
     )
-    content = response.choices[0].message.content
-    if not content:
-        raise RuntimeError("OpenAI response did not contain any content")
-    return content
 
 
 def _call_openai_json_with_web_search(prompt: str, *, model: str) -> str:
     """
     Call OpenAI chat completion with built-in web_search tool support.
     """
-    client = _get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return openai_chat.json_completion(
+        model,
+        [
             {
                 "role": "system",
                 "content": (
@@ -571,12 +514,7 @@ def _call_openai_json_with_web_search(prompt: str, *, model: str) -> str:
         tools=[{"type": "web_search"}],
         tool_choice="auto",
         temperature=0.4,
-        response_format={"type": "json_object"},
     )
-    content = response.choices[0].message.content
-    if not content:
-        raise RuntimeError("OpenAI response did not contain any content")
-    return content
 
 
 def extract_profile_from_text(
@@ -596,7 +534,7 @@ def extract_profile_from_text(
     content = _call_llm(prompt, json_mode=True)
     
     try:
-        profile_data = json.loads(content)
+        profile_data = _json_loads(content)
     except json.JSONDecodeError as exc:
         raise RuntimeError(f"Failed to parse profile extraction response as JSON: {exc}") from exc
 
@@ -610,24 +548,8 @@ def extract_profile_from_pdf(
     return extract_profile_from_text(pdf_text, model=model)
 
 
-def build_prompt(
-    sender: SenderProfile,
-    receiver: ReceiverProfile,
-    goal: str,
-    template: str | None = None,
-) -> list[dict[str, str]]:
-    goal_text = goal.strip()
-    if not goal_text:
-        raise ValueError("Goal must be a non-empty string")
-
-    def _format_section(title: str, items: list[str]) -> str:
-        if not items:
-            return f"- {title}: (not specified)\n"
-        bullet_points = "\n".join(f"  • {item}" for item in items)
-        return f"- {title}:\n{bullet_points}\n"
-
-    # Style guide based on successful cold email templates
-    style_guide = """
+# Style guide based on successful cold email templates
+_EMAIL_STYLE_GUIDE = """
 ## Email Style Guide (based on proven templates)
 
 ### Structure (follow this order):
@@ -661,86 +583,116 @@ def build_prompt(
 - Vague asks (always specify time: "15-20 minute call")
 """
 
-    # Base system instruction
+# Base system instruction for build_prompt (constant, so built once at import)
+_EMAIL_SYSTEM_CONTENT = (
+    "You craft sincere, concise first-contact cold emails that help two people build a genuine connection. "
+    "Use only facts present in the sender/receiver details or explicitly provided evidence; do not invent relationships, meetings, achievements, or affiliations. "
+    "If information is missing, keep it generic rather than guessing. "
+    "Output a complete email with a Subject line and body that is ready to paste into an email client.\n\n"
+    "FORMAT GUIDELINES:\n"
+    "- Start with 'Subject: ' followed by the subject text on one line\n"
+    "- Then a blank line, then the email body\n"
+    "- Use plain text for most content, but you MAY use **bold** sparingly to emphasize key items like company names, specific numbers, or critical achievements\n"
+    "- Do NOT use headings (##), bullet points (- or *), or other heavy Markdown formatting\n"
+    "- Example format:\n"
+    "Subject: Your Subject Here\n\n"
+    "Hi [Name],\n\n"
+    "[Email body with occasional **bold** for emphasis...]\n\n"
+    "Best regards,\n"
+    "[Sender Name]\n\n"
+    + _EMAIL_STYLE_GUIDE
+)
+
+# Extra instruction appended when the user supplies an email template
+_EMAIL_SYSTEM_CONTENT_WITH_TEMPLATE = _EMAIL_SYSTEM_CONTENT + (
+    "\n\nWhen a user-provided email template is included, you must use it as the primary structure and tone: "
+    "keep its overall flow and key phrases where reasonable, but adapt and fill in details using the sender "
+    "and receiver information so the result is a polished, ready-to-send cold email."
+)
+
+
+_PROMPT_BULLET = "  • "
+
+
+def _format_prompt_section(title: str, items: list[str]) -> list[str]:
+    """Render one profile section for build_prompt as newline-terminated fragments."""
+    if not items:
+        return [f"- {title}: (not specified)\n"]
+    return [f"- {title}:\n", *(f"{_PROMPT_BULLET}{item}\n" for item in items)]
+
+
+def build_prompt(
+    sender: SenderProfile,
+    receiver: ReceiverProfile,
+    goal: str,
+    template: str | None = None,
+) -> list[dict[str, str]]:
+    goal_text = goal.strip()
+    if not goal_text:
+        raise ValueError("Goal must be a non-empty string")
+
     system_content = (
-        "You craft sincere, concise first-contact cold emails that help two people build a genuine connection. "
-        "Use only facts present in the sender/receiver details or explicitly provided evidence; do not invent relationships, meetings, achievements, or affiliations. "
-        "If information is missing, keep it generic rather than guessing. "
-        "Output a complete email with a Subject line and body that is ready to paste into an email client.\n\n"
-        "FORMAT GUIDELINES:\n"
-        "- Start with 'Subject: ' followed by the subject text on one line\n"
-        "- Then a blank line, then the email body\n"
-        "- Use plain text for most content, but you MAY use **bold** sparingly to emphasize key items like company names, specific numbers, or critical achievements\n"
-        "- Do NOT use headings (##), bullet points (- or *), or other heavy Markdown formatting\n"
-        "- Example format:\n"
-        "Subject: Your Subject Here\n\n"
-        "Hi [Name],\n\n"
-        "[Email body with occasional **bold** for emphasis...]\n\n"
-        "Best regards,\n"
-        "[Sender Name]\n\n"
-        + style_guide
+        _EMAIL_SYSTEM_CONTENT_WITH_TEMPLATE if template and template.strip() else _EMAIL_SYSTEM_CONTENT
     )
 
-    # If a user template is provided, tell the model how to use it
-    if template and template.strip():
-        system_content += (
-            "\n\nWhen a user-provided email template is included, you must use it as the primary structure and tone: "
-            "keep its overall flow and key phrases where reasonable, but adapt and fill in details using the sender "
-            "and receiver information so the result is a polished, ready-to-send cold email."
-        )
-
     system_message = {
         "role": "system",
         "content": system_content,
     }
 
     # Core content describing profiles and goal
-    base_user_content = (
-        "Sender profile:\n"
-        f"- Name: {sender.name}\n"
-        f"- Motivation: {sender.motivation}\n"
-        f"- Ask: {sender.ask}\n"
-        + _format_section("Education", sender.education)
-        + _format_section("Experiences", sender.experiences)
-        + _format_section("Skills", sender.skills)
-        + _format_section("Projects", sender.projects)
-        + "Sender background (free text):\n"
-        + f"{sender.raw_text}\n\n"
-        + "Receiver profile:\n"
-        + f"- Name: {receiver.name}\n"
-        + (f"- Context: {receiver.context}\n" if receiver.context else "")
-        + (f"- Sources: {', '.join(receiver.sources)}\n" if receiver.sources else "")
-        + _format_section("Education", receiver.education)
-        + _format_section("Experiences", receiver.experiences)
-        + _format_section("Skills", receiver.skills)
-        + _format_section("Projects", receiver.projects)
-        + "Receiver background (free text):\n"
-        + f"{receiver.raw_text}\n\n"
-        + f"Goal: {goal_text}\n\n"
-    )
+    parts: list[str] = [
+        "Sender profile:\n",
+        f"- Name: {sender.name}\n",
+        f"- Motivation: {sender.motivation}\n",
+        f"- Ask: {sender.ask}\n",
+    ]
+    parts.extend(_format_prompt_section("Education", sender.education))
+    parts.extend(_format_prompt_section("Experiences", sender.experiences))
+    parts.extend(_format_prompt_section("Skills", sender.skills))
+    parts.extend(_format_prompt_section("Projects", sender.projects))
+    parts += [
+        "Sender background (free text):\n",
+        f"{sender.raw_text}\n\n",
+        "Receiver profile:\n",
+        f"- Name: {receiver.name}\n",
+    ]
+    if receiver.context:
+        parts.append(f"- Context: {receiver.context}\n")
+    if receiver.sources:
+        parts.append(f"- Sources: {', '.join(receiver.sources)}\n")
+    parts.extend(_format_prompt_section("Education", receiver.education))
+    parts.extend(_format_prompt_section("Experiences", receiver.experiences))
+    parts.extend(_format_prompt_section("Skills", receiver.skills))
+    parts.extend(_format_prompt_section("Projects", receiver.projects))
+    parts += [
+        "Receiver background (free text):\n",
+        f"{receiver.raw_text}\n\n",
+        f"Goal: {goal_text}\n\n",
+    ]
 
     if template and template.strip():
         # Template-guided generation
-        user_content = (
-            base_user_content
-            + "The user has provided an email template they'd like to base the message on.\n"
-            + "Use this template as the main structure and tone. Keep the subject and body well-formed and ready to send.\n\n"
-            + "User email template (between <template> tags):\n"
-            + "<template>\n"
-            + template.strip()
-            + "\n</template>\n\n"
-            + "Please return a single finished email with:\n"
-            + "1) A subject line (you may adapt the template subject if present)\n"
-            + "2) A body (max ~250 words) that follows the template's flow while integrating specific, relevant details from the profiles above."
-        )
+        parts += [
+            "The user has provided an email template they'd like to base the message on.\n",
+            "Use this template as the main structure and tone. Keep the subject and body well-formed and ready to send.\n\n",
+            "User email template (between <template> tags):\n",
+            "<template>\n",
+            template.strip(),
+            "\n</template>\n\n",
+            "Please return a single finished email with:\n",
+            "1) A subject line (you may adapt the template subject if present)\n",
+            "2) A body (max ~250 words) that follows the template's flow while integrating specific, relevant details from the profiles above.",
+        ]
     else:
         # Default smart generation (current behavior)
-        user_content = (
-            base_user_content
-            + "Please return:\n"
-            + "1) A concise, specific subject line\n"
-            + "2) A short email body (max ~200 words) that feels human, references shared interests or context, and ends with a clear but polite call to action."
-        )
+        parts += [
+            "Please return:\n",
+            "1) A concise, specific subject line\n",
+            "2) A short email body (max ~200 words) that feels human, references shared interests or context, and ends with a clear but polite call to action.",
+        ]
+
+    user_content = "".join(parts)
 
     user_message = {
         "role": "user",
@@ -837,7 +789,7 @@ Return JSON only, no other text."""
     content = _call_llm(prompt, json_mode=True)
     
     try:
-        questions = json.loads(content)
+        questions = _json_loads(content)
         return questions
     except json.JSONDecodeError:
         # Return default questions if parsing fails
@@ -957,7 +909,7 @@ Return JSON only, with no additional text."""
 
     content = _call_llm(prompt, json_mode=True)
     try:
-        data = json.loads(content)
+        data = _json_loads(content)
         if not isinstance(data, dict):
             raise ValueError("Expected a JSON object for next question")
         # Minimal normalization
@@ -1075,7 +1027,7 @@ Return JSON only, with no additional text."""
 
     content = _call_llm(prompt, json_mode=True)
     try:
-        data = json.loads(content)
+        data = _json_loads(content)
         if not isinstance(data, dict):
             raise ValueError("Expected a JSON object for next target preference question")
         if "done" not in data:
@@ -1142,7 +1094,7 @@ Return JSON only."""
     content = _call_llm(prompt, json_mode=True)
     
     try:
-        return json.loads(content)
+        return _json_loads(content)
     except json.JSONDecodeError:
         return {
             "name": "User",
@@ -1723,7 +1675,7 @@ Return JSON only, no other text."""
         if not content:
             return None
         
-        data = json.loads(content)
+        data = _json_loads(content)
         
         # 如果 LLM 确认搜索结果不是关于目标人物，返回 None
         if not data.get("person_confirmed", False):
@@ -2299,7 +2251,7 @@ Return JSON only."""
 
     try:
         content = _call_llm(prompt, json_mode=True)
-        result = json.loads(content)
+        result = _json_loads(content)
         scored_list = result.get("scored_candidates", [])
         
         # 合并 AI 分析结果到原始候选人
@@ -2623,7 +2575,7 @@ def find_target_recommendations(
             collected_prompt = search_prompt
             collected_output = content
             
-            raw_items = json.loads(content).get("recommendations", [])
+            raw_items = _json_loads(content).get("recommendations", [])
             # Normalize and generate LinkedIn search URLs (not profile URLs)
             recommendations = _normalize_recommendations(raw_items, grounding_urls=grounding_urls)
             recommendations.sort(key=lambda x: _safe_int(x.get("match_score", 0), default=0), reverse=True)
@@ -2659,7 +2611,7 @@ def find_target_recommendations(
             collected_prompt = fallback_prompt
             collected_output = content
             
-            raw_items = json.loads(content).get("recommendations", [])
+            raw_items = _json_loads(content).get("recommendations", [])
             recommendations = _normalize_recommendations(raw_items)
             recommendations.sort(key=lambda x: _safe_int(x.get("match_score", 0), default=0), reverse=True)
             if recommendations:
@@ -2693,7 +2645,7 @@ def find_target_recommendations(
                 ),
                 model=RECOMMENDATION_MODEL,
             )
-            raw_items = json.loads(content).get("recommendations", [])
+            raw_items = _json_loads(content).get("recommendations", [])
             recommendations = _normalize_recommendations(raw_items)
             recommendations.sort(key=lambda x: _safe_int(x.get("match_score", 0), default=0), reverse=True)
             if recommendations:
@@ -2720,7 +2672,7 @@ def find_target_recommendations(
                 fallback_prompt,
                 json_mode=True,
             )
-            raw_items = json.loads(content).get("recommendations", [])
+            raw_items = _json_loads(content).get("recommendations", [])
             recommendations = _normalize_recommendations(raw_items)
             recommendations.sort(key=lambda x: _safe_int(x.get("match_score", 0), default=0), reverse=True)
             if recommendations:
@@ -2750,7 +2702,7 @@ def find_target_recommendations(
     content = _call_llm(prompt, json_mode=True)
     
     try:
-        raw_items = json.loads(content).get("recommendations", [])
+        raw_items = _json_loads(content).get("recommendations", [])
         recommendations = _normalize_recommendations(raw_items)
         recommendations.sort(key=lambda x: _safe_int(x.get("match_score", 0), default=0), reverse=True)
         if recommendations:
@@ -2830,7 +2782,7 @@ Extract as much relevant information as possible. Return JSON only."""
     content = _call_llm(prompt, json_mode=True)
     
     try:
-        profile = json.loads(content)
+        profile = _json_loads(content)
         # Ensure required fields
         profile.setdefault('name', name or 'Unknown')
         profile.setdefault('field', field)
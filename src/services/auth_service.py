@@ -14,9 +14,13 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
+import queue
 import secrets
 import sqlite3
-import uuid
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
@@ -35,6 +39,111 @@ logger = logging.getLogger(__name__)
 LOGIN_MAX_ATTEMPTS = 5
 LOGIN_LOCKOUT_MINUTES = 15
 
+# Idle SQLite connections kept open per AuthService instance
+CONNECTION_POOL_SIZE = 8
+# Prepared statements cached per connection (sqlite3 keys the cache by SQL text)
+STATEMENT_CACHE_SIZE = 256
+# Per-connection page cache and mmap window; sized so a full pool stays well
+# under typical small-instance memory limits.
+SQLITE_CACHE_SIZE_KIB = 8 * 1024
+SQLITE_MMAP_SIZE_BYTES = 64 * 1024 * 1024
+
+# In-process cache for get_user() (session -> user resolution on every request)
+USER_CACHE_TTL_SECONDS = 30.0
+USER_CACHE_MAX_ENTRIES = 5000
+
+
+# Bump when _SCHEMA_SQL or the column migrations change; databases whose
+# PRAGMA user_version is already current skip _init_db entirely.
+_SCHEMA_VERSION = 2
+
+# (provider, provider_sub) and token_hash are already indexed by their UNIQUE constraints.
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    primary_email TEXT,
+    display_name TEXT,
+    avatar_url TEXT,
+    created_at TEXT NOT NULL,
+    last_login_at TEXT,
+    is_active INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS auth_identities (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    provider_sub TEXT NOT NULL,
+    email TEXT,
+    password_hash TEXT,
+    email_verified INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    last_used_at TEXT,
+    UNIQUE(provider, provider_sub),
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS user_profiles (
+    user_id TEXT PRIMARY KEY,
+    sender_profile_json TEXT NOT NULL DEFAULT '{}',
+    preferences_json TEXT NOT NULL DEFAULT '{}',
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS email_verifications (
+    id TEXT PRIMARY KEY,
+    identity_id TEXT NOT NULL,
+    token_hash TEXT NOT NULL UNIQUE,
+    expires_at TEXT NOT NULL,
+    expires_at_ts INTEGER,
+    used_at TEXT,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(identity_id) REFERENCES auth_identities(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS login_events (
+    id TEXT PRIMARY KEY,
+    user_id TEXT,
+    provider TEXT,
+    email TEXT,
+    success INTEGER NOT NULL,
+    reason TEXT,
+    ip TEXT,
+    user_agent TEXT,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE SET NULL
+);
+
+CREATE TABLE IF NOT EXISTS waitlist (
+    id TEXT PRIMARY KEY,
+    email TEXT NOT NULL UNIQUE,
+    created_at TEXT NOT NULL,
+    ip TEXT,
+    user_agent TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_users_primary_email ON users(primary_email);
+CREATE INDEX IF NOT EXISTS idx_auth_identities_email ON auth_identities(email);
+CREATE INDEX IF NOT EXISTS idx_login_events_email_created ON login_events(email, created_at);
+"""
+
+# Failed-login counts for the lockout check; both are served by idx_login_events_email_created.
+_LOCKOUT_COUNT_SQL = """
+SELECT COUNT(*) AS cnt FROM login_events
+WHERE success = 0 AND email = ? AND created_at > ?
+"""
+_LOCKOUT_COUNT_BY_IP_SQL = """
+SELECT COUNT(*) AS cnt FROM login_events
+WHERE success = 0 AND email = ? AND (ip = ? OR ip IS NULL) AND created_at > ?
+"""
+
+
+# Database files already prepared by this process; further AuthService
+# instances on the same path skip the mkdir and schema check.
+_INITIALIZED_PATHS: set[str] = set()
+_INITIALIZED_PATHS_LOCK = threading.Lock()
+
 
 def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
@@ -44,6 +153,11 @@ def _now_iso() -> str:
     return _utc_now().isoformat()
 
 
+def _new_id() -> str:
+    """Opaque 128-bit random row id (hex)."""
+    return secrets.token_hex(16)
+
+
 def _normalize_email(email: str) -> str:
     return (email or "").strip().lower()
 
@@ -109,8 +223,18 @@ class AuthService:
         self._email_verify_ttl_hours = (
             EMAIL_VERIFY_TTL_HOURS if email_verify_ttl_hours is None else int(email_verify_ttl_hours)
         )
-        self._ensure_parent_dir()
-        self._init_db()
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue(maxsize=CONNECTION_POOL_SIZE)
+        self._user_cache: dict[str, tuple[float, User]] = {}
+        self._user_cache_lock = threading.Lock()
+        # Bumped on every invalidation; get_user() only caches a row if no
+        # invalidation happened while it was reading.
+        self._user_cache_generation = 0
+        path_key = str(self._db_path)
+        with _INITIALIZED_PATHS_LOCK:
+            if path_key not in _INITIALIZED_PATHS:
+                self._ensure_parent_dir()
+                self._init_db()
+                _INITIALIZED_PATHS.add(path_key)
 
     @property
     def db_path(self) -> Path:
@@ -122,104 +246,56 @@ class AuthService:
         except PermissionError:
             pass
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(str(self._db_path))
+    def _new_connection(self) -> sqlite3.Connection:
+        # Per-connection settings are applied once here, not on every checkout.
+        conn = sqlite3.connect(
+            str(self._db_path),
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute(f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KIB}")
+        conn.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE_BYTES}")
         return conn
 
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Check out a pooled connection; commits on success, rolls back on error."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._new_connection()
+        try:
+            with conn:
+                yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self) -> None:
+        """Close all idle pooled connections."""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
     def _init_db(self) -> None:
         with self._connect() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+                return
             conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS users (
-                    id TEXT PRIMARY KEY,
-                    primary_email TEXT,
-                    display_name TEXT,
-                    avatar_url TEXT,
-                    created_at TEXT NOT NULL,
-                    last_login_at TEXT,
-                    is_active INTEGER NOT NULL DEFAULT 1
-                )
-                """
-            )
+            conn.executescript(_SCHEMA_SQL)
             self._ensure_user_columns(conn)
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS auth_identities (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT NOT NULL,
-                    provider TEXT NOT NULL,
-                    provider_sub TEXT NOT NULL,
-                    email TEXT,
-                    password_hash TEXT,
-                    email_verified INTEGER NOT NULL DEFAULT 0,
-                    created_at TEXT NOT NULL,
-                    last_used_at TEXT,
-                    UNIQUE(provider, provider_sub),
-                    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-                """
-            )
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS user_profiles (
-                    user_id TEXT PRIMARY KEY,
-                    sender_profile_json TEXT NOT NULL DEFAULT '{}',
-                    preferences_json TEXT NOT NULL DEFAULT '{}',
-                    updated_at TEXT NOT NULL,
-                    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
-                )
-                """
-            )
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS email_verifications (
-                    id TEXT PRIMARY KEY,
-                    identity_id TEXT NOT NULL,
-                    token_hash TEXT NOT NULL UNIQUE,
-                    expires_at TEXT NOT NULL,
-                    used_at TEXT,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY(identity_id) REFERENCES auth_identities(id) ON DELETE CASCADE
-                )
-                """
-            )
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS login_events (
-                    id TEXT PRIMARY KEY,
-                    user_id TEXT,
-                    provider TEXT,
-                    email TEXT,
-                    success INTEGER NOT NULL,
-                    reason TEXT,
-                    ip TEXT,
-                    user_agent TEXT,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE SET NULL
-                )
-                """
-            )
-
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS waitlist (
-                    id TEXT PRIMARY KEY,
-                    email TEXT NOT NULL UNIQUE,
-                    created_at TEXT NOT NULL,
-                    ip TEXT,
-                    user_agent TEXT
-                )
-                """
-            )
+            self._ensure_email_verification_columns(conn)
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
     def _ensure_user_columns(self, conn: sqlite3.Connection) -> None:
         """Best-effort schema migrations for the users table."""
@@ -235,6 +311,21 @@ class AuthService:
                 # Column likely already exists.
                 continue
 
+    def _ensure_email_verification_columns(self, conn: sqlite3.Connection) -> None:
+        """Add the epoch expiry column and backfill it from the ISO timestamp."""
+        try:
+            conn.execute("ALTER TABLE email_verifications ADD COLUMN expires_at_ts INTEGER")
+        except sqlite3.OperationalError:
+            # Column likely already exists.
+            pass
+        conn.execute(
+            """
+            UPDATE email_verifications
+            SET expires_at_ts = CAST(strftime('%s', expires_at) AS INTEGER)
+            WHERE expires_at_ts IS NULL
+            """
+        )
+
     def _validate_invite_code(self, invite_code: str | None, *, enforce: bool) -> None:  # noqa: ARG002
         # Invite-code gating has been removed. This shim is retained as a no-op so
         # any forgotten internal callers do not crash.
@@ -292,11 +383,13 @@ class AuthService:
                 INSERT INTO waitlist (id, email, created_at, ip, user_agent)
                 VALUES (?, ?, ?, ?, ?)
                 """,
-                (str(uuid.uuid4()), email_norm, _now_iso(), ip, user_agent),
+                (_new_id(), email_norm, _now_iso(), ip, user_agent),
             )
             return True
 
     def _ensure_profile_row(self, conn: sqlite3.Connection, user_id: str) -> None:
+        # Called when a user is created and lazily by the profile accessors;
+        # login paths skip it.
         now = _now_iso()
         conn.execute(
             """
@@ -324,7 +417,7 @@ class AuthService:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
-                str(uuid.uuid4()),
+                _new_id(),
                 user_id,
                 provider,
                 email,
@@ -336,19 +429,73 @@ class AuthService:
             ),
         )
 
+    def _touch_user(
+        self,
+        conn: sqlite3.Connection,
+        user_id: str,
+        *,
+        email: str | None,
+        display_name: str | None,
+        avatar_url: str | None,
+        now: str,
+    ) -> sqlite3.Row:
+        """Refresh login metadata on an existing user and return the updated row.
+
+        The caller must invalidate the cached user once the transaction commits.
+        """
+        row = conn.execute(
+            """
+            UPDATE users
+            SET primary_email = COALESCE(primary_email, ?),
+                display_name = COALESCE(?, display_name),
+                avatar_url = COALESCE(?, avatar_url),
+                last_login_at = ?
+            WHERE id = ?
+            RETURNING id, primary_email, display_name, avatar_url, created_at, last_login_at
+            """,
+            (email, display_name, avatar_url, now, user_id),
+        ).fetchone()
+        return row
+
     def _row_to_user(self, row: sqlite3.Row) -> User:
-        return User(
-            id=row["id"],
-            primary_email=row["primary_email"],
-            display_name=row["display_name"],
-            avatar_url=row["avatar_url"],
-            created_at=row["created_at"],
-            last_login_at=row["last_login_at"],
-        )
+        # Positional: every caller selects the six User columns first, in field order.
+        return User(*row[:6])
+
+    def _get_cached_user(self, user_id: str) -> User | None:
+        with self._user_cache_lock:
+            entry = self._user_cache.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._user_cache[user_id]
+                return None
+            return entry[1]
+
+    def _cache_user(self, user: User, generation: int) -> None:
+        now = time.monotonic()
+        with self._user_cache_lock:
+            if generation != self._user_cache_generation:
+                return
+            if len(self._user_cache) >= USER_CACHE_MAX_ENTRIES:
+                expired = [key for key, (expires, _) in self._user_cache.items() if expires <= now]
+                for key in expired:
+                    del self._user_cache[key]
+                if len(self._user_cache) >= USER_CACHE_MAX_ENTRIES:
+                    self._user_cache.clear()
+            self._user_cache[user.id] = (now + USER_CACHE_TTL_SECONDS, user)
+
+    def _invalidate_user(self, user_id: str) -> None:
+        with self._user_cache_lock:
+            self._user_cache_generation += 1
+            self._user_cache.pop(user_id, None)
 
     def get_user(self, user_id: str) -> User | None:
         if not user_id:
             return None
+        cached = self._get_cached_user(user_id)
+        if cached is not None:
+            return cached
+        generation = self._user_cache_generation
         with self._connect() as conn:
             row = conn.execute(
                 """
@@ -359,7 +506,11 @@ class AuthService:
                 """,
                 (user_id,),
             ).fetchone()
-            return self._row_to_user(row) if row else None
+        if not row:
+            return None
+        user = self._row_to_user(row)
+        self._cache_user(user, generation)
+        return user
 
     # ---------------------------------------------------------------------
     # Password accounts
@@ -392,8 +543,8 @@ class AuthService:
             raise AuthError("Password must contain at least 2 of: uppercase letters, lowercase letters, digits.")
 
         now = _now_iso()
-        user_id = str(uuid.uuid4())
-        identity_id = str(uuid.uuid4())
+        user_id = _new_id()
+        identity_id = _new_id()
 
         password_hash = generate_password_hash(password)
 
@@ -446,21 +597,9 @@ class AuthService:
         cutoff = (_utc_now() - timedelta(minutes=LOGIN_LOCKOUT_MINUTES)).isoformat()
         # Check both IP-specific and email-wide lockout
         if ip:
-            row = conn.execute(
-                """
-                SELECT COUNT(*) AS cnt FROM login_events
-                WHERE success = 0 AND email = ? AND (ip = ? OR ip IS NULL) AND created_at > ?
-                """,
-                (email, ip, cutoff),
-            ).fetchone()
+            row = conn.execute(_LOCKOUT_COUNT_BY_IP_SQL, (email, ip, cutoff)).fetchone()
         else:
-            row = conn.execute(
-                """
-                SELECT COUNT(*) AS cnt FROM login_events
-                WHERE success = 0 AND email = ? AND created_at > ?
-                """,
-                (email, cutoff),
-            ).fetchone()
+            row = conn.execute(_LOCKOUT_COUNT_SQL, (email, cutoff)).fetchone()
         if row and int(row["cnt"]) >= LOGIN_MAX_ATTEMPTS:
             raise AccountLockedError(
                 f"Too many failed login attempts. Please try again in {LOGIN_LOCKOUT_MINUTES} minutes."
@@ -485,16 +624,16 @@ class AuthService:
             row = conn.execute(
                 """
                 SELECT
-                    ai.id AS identity_id,
-                    ai.user_id,
-                    ai.password_hash,
-                    ai.email_verified,
                     u.id,
                     u.primary_email,
                     u.display_name,
                     u.avatar_url,
                     u.created_at,
-                    u.last_login_at
+                    u.last_login_at,
+                    ai.id AS identity_id,
+                    ai.user_id,
+                    ai.password_hash,
+                    ai.email_verified
                 FROM auth_identities ai
                 JOIN users u ON u.id = ai.user_id
                 WHERE ai.provider = 'password' AND ai.provider_sub = ?
@@ -547,8 +686,9 @@ class AuthService:
                 ip=ip,
                 user_agent=user_agent,
             )
-            self._ensure_profile_row(conn, row["user_id"])
-            return self._row_to_user(row)
+            user = self._row_to_user(row)
+        self._invalidate_user(user.id)
+        return user
 
     def _create_email_verification(
         self, conn: sqlite3.Connection, identity_id: str, email: str
@@ -560,14 +700,17 @@ class AuthService:
 
         conn.execute(
             """
-            INSERT INTO email_verifications (id, identity_id, token_hash, expires_at, used_at, created_at)
-            VALUES (?, ?, ?, ?, NULL, ?)
+            INSERT INTO email_verifications (
+                id, identity_id, token_hash, expires_at, expires_at_ts, used_at, created_at
+            )
+            VALUES (?, ?, ?, ?, ?, NULL, ?)
             """,
             (
-                str(uuid.uuid4()),
+                _new_id(),
                 identity_id,
                 token_hash,
                 expires_at_dt.isoformat(),
+                int(expires_at_dt.timestamp()),
                 now_dt.isoformat(),
             ),
         )
@@ -622,26 +765,16 @@ class AuthService:
         with self._connect() as conn:
             row = conn.execute(
                 """
-                SELECT ev.id AS verification_id, ev.expires_at, ev.used_at, ai.id AS identity_id, ai.user_id
+                SELECT ev.id AS verification_id, ai.id AS identity_id, ai.user_id
                 FROM email_verifications ev
                 JOIN auth_identities ai ON ai.id = ev.identity_id
-                WHERE ev.token_hash = ?
+                WHERE ev.token_hash = ? AND ev.used_at IS NULL AND ev.expires_at_ts >= ?
                 LIMIT 1
                 """,
-                (token_hash,),
+                (token_hash, int(now.timestamp())),
             ).fetchone()
             if not row:
                 return None
-            if row["used_at"]:
-                return None
-            try:
-                expires_at = datetime.fromisoformat(row["expires_at"])
-            except Exception:
-                return None
-            if expires_at.tzinfo is None:
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-            if expires_at < now:
-                return None
 
             now_iso = now.isoformat()
             conn.execute(
@@ -652,7 +785,6 @@ class AuthService:
                 "UPDATE email_verifications SET used_at = ? WHERE id = ?",
                 (now_iso, row["verification_id"]),
             )
-            self._ensure_profile_row(conn, row["user_id"])
             return row["user_id"]
 
     # ---------------------------------------------------------------------
@@ -676,134 +808,98 @@ class AuthService:
             raise AuthError("Missing Google subject.")
 
         email_norm = _normalize_email(email or "") if email else None
+        display_name_norm = (display_name or "").strip() or None
         now = _now_iso()
 
         with self._connect() as conn:
-            identity = conn.execute(
-                """
-                SELECT ai.user_id
-                FROM auth_identities ai
-                WHERE ai.provider = 'google' AND ai.provider_sub = ?
-                LIMIT 1
-                """,
-                (google_sub,),
-            ).fetchone()
+            # Take the write lock up front so the identity lookup and the
+            # insert/update that follows are one atomic transaction.
+            conn.execute("BEGIN IMMEDIATE")
+            user = self._authenticate_google_in_transaction(
+                conn,
+                google_sub=google_sub,
+                email_norm=email_norm,
+                display_name_norm=display_name_norm,
+                avatar_url=avatar_url,
+                email_verified=email_verified,
+                now=now,
+                ip=ip,
+                user_agent=user_agent,
+            )
+        # Only after commit: a concurrent get_user() must not re-cache the old row.
+        self._invalidate_user(user.id)
+        return user
 
-            if identity:
-                user_id = identity["user_id"]
-                conn.execute(
-                    "UPDATE auth_identities SET last_used_at = ? WHERE provider = 'google' AND provider_sub = ?",
-                    (now, google_sub),
-                )
-                conn.execute(
-                    """
-                    UPDATE users
-                    SET primary_email = COALESCE(primary_email, ?),
-                        display_name = COALESCE(?, display_name),
-                        avatar_url = COALESCE(?, avatar_url),
-                        last_login_at = ?
-                    WHERE id = ?
-                    """,
-                    (email_norm, (display_name or "").strip() or None, avatar_url, now, user_id),
-                )
-                self._ensure_profile_row(conn, user_id)
-                self._record_login_event(
-                    conn,
-                    user_id=user_id,
-                    provider="google",
-                    email=email_norm,
-                    success=True,
-                    reason="login",
-                    ip=ip,
-                    user_agent=user_agent,
-                )
-                row = conn.execute(
-                    "SELECT id, primary_email, display_name, avatar_url, created_at, last_login_at FROM users WHERE id = ?",
-                    (user_id,),
-                ).fetchone()
-                return self._row_to_user(row)
+    def _authenticate_google_in_transaction(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        google_sub: str,
+        email_norm: str | None,
+        display_name_norm: str | None,
+        avatar_url: str | None,
+        email_verified: bool | None,
+        now: str,
+        ip: str | None,
+        user_agent: str | None,
+    ) -> User:
+        identity = conn.execute(
+            """
+            SELECT ai.user_id
+            FROM auth_identities ai
+            WHERE ai.provider = 'google' AND ai.provider_sub = ?
+            LIMIT 1
+            """,
+            (google_sub,),
+        ).fetchone()
 
-            # Link to existing user by verified email (preferred) or by any matching email (fallback).
-            user_row = None
-            if email_norm:
+        if identity:
+            user_id = identity["user_id"]
+            conn.execute(
+                "UPDATE auth_identities SET last_used_at = ? WHERE provider = 'google' AND provider_sub = ?",
+                (now, google_sub),
+            )
+            row = self._touch_user(
+                conn,
+                user_id,
+                email=email_norm,
+                display_name=display_name_norm,
+                avatar_url=avatar_url,
+                now=now,
+            )
+            self._record_login_event(
+                conn,
+                user_id=user_id,
+                provider="google",
+                email=email_norm,
+                success=True,
+                reason="login",
+                ip=ip,
+                user_agent=user_agent,
+            )
+            return self._row_to_user(row)
+
+        # Link to existing user by primary email (preferred) or by any identity with that email (fallback).
+        user_row = None
+        if email_norm:
+            user_row = conn.execute(
+                "SELECT id FROM users WHERE primary_email = ? LIMIT 1",
+                (email_norm,),
+            ).fetchone()
+            if not user_row:
                 user_row = conn.execute(
                     """
-                    SELECT id, primary_email, display_name, avatar_url, created_at, last_login_at
-                    FROM users
-                    WHERE primary_email = ?
+                    SELECT u.id
+                    FROM auth_identities ai
+                    JOIN users u ON u.id = ai.user_id
+                    WHERE ai.email = ?
                     LIMIT 1
                     """,
                     (email_norm,),
                 ).fetchone()
-                if not user_row:
-                    user_row = conn.execute(
-                        """
-                        SELECT u.id, u.primary_email, u.display_name, u.avatar_url, u.created_at, u.last_login_at
-                        FROM auth_identities ai
-                        JOIN users u ON u.id = ai.user_id
-                        WHERE ai.email = ?
-                        LIMIT 1
-                        """,
-                        (email_norm,),
-                    ).fetchone()
-
-            if user_row and (email_verified is True):
-                user_id = user_row["id"]
-                conn.execute(
-                    """
-                    INSERT INTO auth_identities (
-                        id, user_id, provider, provider_sub, email, password_hash, email_verified, created_at, last_used_at
-                    )
-                    VALUES (?, ?, 'google', ?, ?, NULL, ?, ?, ?)
-                    """,
-                    (
-                        str(uuid.uuid4()),
-                        user_id,
-                        google_sub,
-                        email_norm,
-                        1,
-                        now,
-                        now,
-                    ),
-                )
-                conn.execute(
-                    """
-                    UPDATE users
-                    SET display_name = COALESCE(?, display_name),
-                        avatar_url = COALESCE(?, avatar_url),
-                        last_login_at = ?
-                    WHERE id = ?
-                    """,
-                    ((display_name or "").strip() or None, avatar_url, now, user_id),
-                )
-                self._ensure_profile_row(conn, user_id)
-                self._record_login_event(
-                    conn,
-                    user_id=user_id,
-                    provider="google",
-                    email=email_norm,
-                    success=True,
-                    reason="link_and_login",
-                    ip=ip,
-                    user_agent=user_agent,
-                )
-                return self._row_to_user(user_row)
 
-            user_id = str(uuid.uuid4())
-            conn.execute(
-                """
-                INSERT INTO users (id, primary_email, display_name, avatar_url, created_at, last_login_at, is_active)
-                VALUES (?, ?, ?, ?, ?, ?, 1)
-                """,
-                (
-                    user_id,
-                    email_norm,
-                    (display_name or "").strip() or None,
-                    avatar_url,
-                    now,
-                    now,
-                ),
-            )
+        if user_row and (email_verified is True):
+            user_id = user_row["id"]
             conn.execute(
                 """
                 INSERT INTO auth_identities (
@@ -812,32 +908,81 @@ class AuthService:
                 VALUES (?, ?, 'google', ?, ?, NULL, ?, ?, ?)
                 """,
                 (
-                    str(uuid.uuid4()),
+                    _new_id(),
                     user_id,
                     google_sub,
                     email_norm,
-                    1 if (email_verified is True) else 0,
+                    1,
                     now,
                     now,
                 ),
             )
-            self._ensure_profile_row(conn, user_id)
+            row = self._touch_user(
+                conn,
+                user_id,
+                email=None,
+                display_name=display_name_norm,
+                avatar_url=avatar_url,
+                now=now,
+            )
             self._record_login_event(
                 conn,
                 user_id=user_id,
                 provider="google",
                 email=email_norm,
                 success=True,
-                reason="signup_and_login",
+                reason="link_and_login",
                 ip=ip,
                 user_agent=user_agent,
             )
-            row = conn.execute(
-                "SELECT id, primary_email, display_name, avatar_url, created_at, last_login_at FROM users WHERE id = ?",
-                (user_id,),
-            ).fetchone()
             return self._row_to_user(row)
 
+        user_id = _new_id()
+        row = conn.execute(
+            """
+            INSERT INTO users (id, primary_email, display_name, avatar_url, created_at, last_login_at, is_active)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+            RETURNING id, primary_email, display_name, avatar_url, created_at, last_login_at
+            """,
+            (
+                user_id,
+                email_norm,
+                display_name_norm,
+                avatar_url,
+                now,
+                now,
+            ),
+        ).fetchone()
+        conn.execute(
+            """
+            INSERT INTO auth_identities (
+                id, user_id, provider, provider_sub, email, password_hash, email_verified, created_at, last_used_at
+            )
+            VALUES (?, ?, 'google', ?, ?, NULL, ?, ?, ?)
+            """,
+            (
+                _new_id(),
+                user_id,
+                google_sub,
+                email_norm,
+                1 if (email_verified is True) else 0,
+                now,
+                now,
+            ),
+        )
+        self._ensure_profile_row(conn, user_id)
+        self._record_login_event(
+            conn,
+            user_id=user_id,
+            provider="google",
+            email=email_norm,
+            success=True,
+            reason="signup_and_login",
+            ip=ip,
+            user_agent=user_agent,
+        )
+        return self._row_to_user(row)
+
     # ---------------------------------------------------------------------
     # User profile (sender profile + preferences)
     # ---------------------------------------------------------------------
@@ -873,17 +1018,27 @@ class AuthService:
 
         now = _now_iso()
         with self._connect() as conn:
-            self._ensure_profile_row(conn, user_id)
-            if sender_profile is not None:
-                conn.execute(
-                    "UPDATE user_profiles SET sender_profile_json = ?, updated_at = ? WHERE user_id = ?",
-                    (json.dumps(sender_profile, ensure_ascii=False), now, user_id),
-                )
-            if preferences is not None:
-                conn.execute(
-                    "UPDATE user_profiles SET preferences_json = ?, updated_at = ? WHERE user_id = ?",
-                    (json.dumps(preferences, ensure_ascii=False), now, user_id),
-                )
+            if sender_profile is None and preferences is None:
+                self._ensure_profile_row(conn, user_id)
+                return
+            # One upsert: creates the row if missing, and leaves a blob
+            # untouched when its argument is None.
+            conn.execute(
+                """
+                INSERT INTO user_profiles (user_id, sender_profile_json, preferences_json, updated_at)
+                VALUES (?1, COALESCE(?2, '{}'), COALESCE(?3, '{}'), ?4)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    sender_profile_json = COALESCE(?2, sender_profile_json),
+                    preferences_json = COALESCE(?3, preferences_json),
+                    updated_at = ?4
+                """,
+                (
+                    user_id,
+                    json.dumps(sender_profile, ensure_ascii=False) if sender_profile is not None else None,
+                    json.dumps(preferences, ensure_ascii=False) if preferences is not None else None,
+                    now,
+                ),
+            )
 
 
 # Global instance for app usage
@@ -18,17 +18,32 @@ import json
 import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any, Literal
-
-# Optional Gemini dependency (keep import-time light for tests/CI)
-try:
-    import google.generativeai as genai  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover
-    genai = None  # type: ignore
-from openai import OpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Literal
 
 from config import DEFAULT_MODEL, GEMINI_SEARCH_MODEL
 
+from src.services import openai_chat
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+@lru_cache(maxsize=1)
+def _lazy_genai() -> Any:
+    """Import the optional Gemini SDK on first use (it is slow to import)."""
+    try:
+        import google.generativeai as genai  # type: ignore
+    except ModuleNotFoundError:  # pragma: no cover
+        return None
+    return genai
+
+
+@lru_cache(maxsize=1)
+def _json_generation_config() -> Any:
+    """Shared (read-only) Gemini config for JSON-mode calls."""
+    return _lazy_genai().GenerationConfig(response_mime_type="application/json")
+
 
 class LLMServiceError(Exception):
     """Raised when LLM call fails."""
@@ -87,11 +102,16 @@ class GeminiService(BaseLLMService):
         self.model = model
         self.search_model = search_model
         self._configured = False
+        # Model handles and the search tool are built once and reused across calls.
+        self._model_client: Any = None
+        self._search_model_client: Any = None
+        self._search_tool: Any = None
     
     def _configure(self) -> None:
         """Configure Gemini API (lazy initialization)."""
         if self._configured:
             return
+        genai = _lazy_genai()
         if genai is None:
             raise LLMServiceError(
                 "google-generativeai is not installed. Install dependencies with `python -m pip install -r requirements.txt`."
@@ -106,13 +126,10 @@ class GeminiService(BaseLLMService):
         """Call Gemini model."""
         self._configure()
         try:
-            gen_config = None
-            if json_mode:
-                gen_config = genai.GenerationConfig(
-                    response_mime_type="application/json"
-                )
-            model = genai.GenerativeModel(self.model)
-            response = model.generate_content(prompt, generation_config=gen_config)
+            gen_config = _json_generation_config() if json_mode else None
+            if self._model_client is None:
+                self._model_client = _lazy_genai().GenerativeModel(self.model)
+            response = self._model_client.generate_content(prompt, generation_config=gen_config)
             return response.text
         except Exception as e:
             raise LLMServiceError(f"Gemini call failed: {e}") from e
@@ -121,21 +138,19 @@ class GeminiService(BaseLLMService):
         """Call Gemini with Google Search grounding."""
         self._configure()
         try:
-            from google.generativeai import protos
+            gen_config = _json_generation_config() if json_mode else None
             
-            gen_config = None
-            if json_mode:
-                gen_config = genai.GenerationConfig(
-                    response_mime_type="application/json"
+            if self._search_model_client is None:
+                from google.generativeai import protos
+
+                genai = _lazy_genai()
+                self._search_model_client = genai.GenerativeModel(self.search_model)
+                self._search_tool = genai.Tool(
+                    google_search=protos.GoogleSearch()
                 )
-            
-            model = genai.GenerativeModel(self.search_model)
-            google_search_tool = genai.Tool(
-                google_search=protos.GoogleSearch()
-            )
-            response = model.generate_content(
+            response = self._search_model_client.generate_content(
                 prompt,
-                tools=[google_search_tool],
+                tools=[self._search_tool],
                 generation_config=gen_config,
             )
             return response.text
@@ -156,6 +171,8 @@ class OpenAIService(BaseLLMService):
             api_key = os.environ.get("OPENAI_API_KEY")
             if not api_key:
                 raise LLMServiceError("OPENAI_API_KEY environment variable not set")
+            from openai import OpenAI
+
             self._client = OpenAI(api_key=api_key)
         return self._client
     
@@ -163,14 +180,10 @@ class OpenAIService(BaseLLMService):
         """Call OpenAI model."""
         try:
             client = self._get_client()
-            response_format = {"type": "json_object"} if json_mode else None
-            
-            response = client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format=response_format,
-            )
-            return response.choices[0].message.content or ""
+            messages = [{"role": "user", "content": prompt}]
+            if json_mode:
+                return openai_chat.json_completion(self.model, messages, client=client)
+            return openai_chat.chat_completion(self.model, messages, client=client)
         except Exception as e:
             raise LLMServiceError(f"OpenAI call failed: {e}") from e
     
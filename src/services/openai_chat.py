@@ -0,0 +1,150 @@
+"""OpenAI chat completions with per-model request shaping.
+
+Leaf module shared by email_agent, web_scraper and llm_service. It imports
+neither the Gemini SDKs nor the rest of the app, so OpenAI callers do not pay
+for them; the openai package itself is imported on first client use.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+# Optional faster JSON decoder; orjson.JSONDecodeError subclasses json.JSONDecodeError
+try:
+    import orjson  # type: ignore
+except ModuleNotFoundError:  # pragma: no cover
+    orjson = None  # type: ignore
+_json_loads = orjson.loads if orjson is not None else json.loads
+_json_decoder = json.JSONDecoder()
+_JSON_BLOCK_RE = re.compile(r'```(?:json)?\s*\n?([\s\S]*?)\n?```')
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+# Request parameters that whole OpenAI model families reject (reasoning models only
+# accept the default temperature; the first o1 previews also lack JSON mode and tools).
+# Checked by prefix, first match wins, so list more specific prefixes first.
+_O1_PREVIEW_UNSUPPORTED = frozenset({"temperature", "response_format", "tools", "tool_choice"})
+_MODEL_FAMILY_UNSUPPORTED: tuple[tuple[str, frozenset[str]], ...] = (
+    ("o1-mini", _O1_PREVIEW_UNSUPPORTED),
+    ("o1-preview", _O1_PREVIEW_UNSUPPORTED),
+    ("o1", frozenset({"temperature"})),
+    ("o3", frozenset({"temperature"})),
+    ("o4", frozenset({"temperature"})),
+    ("gpt-5", frozenset({"temperature"})),
+)
+
+# Model prefixes that reject role="system" messages; their system text is folded
+# into the first user message instead.
+_NO_SYSTEM_ROLE: tuple[str, ...] = ("o1-mini", "o1-preview")
+
+
+@lru_cache(maxsize=32)
+def unsupported_params(model: str) -> frozenset[str]:
+    for prefix, params in _MODEL_FAMILY_UNSUPPORTED:
+        if model.startswith(prefix):
+            return params
+    return frozenset()
+
+
+def request_kwargs(model: str, **kwargs: Any) -> dict[str, Any]:
+    """Build chat.completions.create kwargs, dropping params the model family rejects."""
+    unsupported = unsupported_params(model)
+    if unsupported:
+        kwargs = {k: v for k, v in kwargs.items() if k not in unsupported}
+    if "messages" in kwargs and model.startswith(_NO_SYSTEM_ROLE):
+        kwargs["messages"] = fold_system_messages(kwargs["messages"])
+    return {"model": model, **kwargs}
+
+
+def fold_system_messages(messages: list[dict[str, str]]) -> list[dict[str, str]]:
+    """Prepend system content to the first user message for models without a system role."""
+    system_parts = [m["content"] for m in messages if m["role"] == "system"]
+    if not system_parts:
+        return messages
+    folded = [m for m in messages if m["role"] != "system"]
+    system_text = "\n\n".join(system_parts)
+    for i, message in enumerate(folded):
+        if message["role"] == "user":
+            folded[i] = {**message, "content": f"{system_text}\n\n{message['content']}"}
+            break
+    else:
+        folded.insert(0, {"role": "user", "content": system_text})
+    return folded
+
+
+@lru_cache(maxsize=1)
+def _client_for_key(api_key: str) -> OpenAI:
+    """Build one OpenAI client per API key so its HTTP connection pool is reused."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+def get_client() -> OpenAI:
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable is required for OpenAI models")
+    return _client_for_key(api_key)
+
+
+def chat_completion(
+    model: str,
+    messages: list[dict[str, str]],
+    *,
+    client: OpenAI | None = None,
+    **kwargs: Any,
+) -> str:
+    """Single entry point for OpenAI chat completions; returns the message text.
+
+    ``client`` lets callers that manage their own OpenAI client (e.g.
+    ``OpenAIService``) share the request shaping; defaults to the cached client.
+    """
+    if client is None:
+        client = get_client()
+    response = client.chat.completions.create(**request_kwargs(model, messages=messages, **kwargs))
+    content = response.choices[0].message.content
+    if not content:
+        raise RuntimeError("OpenAI response did not contain any content")
+    return content
+
+
+def json_completion(model: str, messages: list[dict[str, str]], **kwargs: Any) -> str:
+    """JSON-mode completion; models without response_format rely on the prompt plus extraction."""
+    if "response_format" in unsupported_params(model):
+        return extract_json_from_text(chat_completion(model, messages, **kwargs))
+    return chat_completion(model, messages, response_format={"type": "json_object"}, **kwargs)
+
+
+def extract_json_from_text(text: str) -> str:
+    """
+    Extract JSON from text that may contain markdown code blocks or other content.
+    """
+    # Try to find JSON in markdown code blocks (skip the regex when there is no fence)
+    if "```" in text:
+        for match in _JSON_BLOCK_RE.findall(text):
+            candidate = match.strip()
+            try:
+                _json_loads(candidate)
+                return candidate
+            except json.JSONDecodeError:
+                continue
+
+    # Try to find raw JSON object: raw_decode parses the first complete value
+    # starting at each '{' (string-aware, in C) and reports where it ends.
+    brace_start = text.find('{')
+    while brace_start != -1:
+        try:
+            _, end = _json_decoder.raw_decode(text, brace_start)
+        except json.JSONDecodeError:
+            brace_start = text.find('{', brace_start + 1)
+            continue
+        return text[brace_start:end]
+
+    # Return original text if no JSON found
+    return text
@@ -14,9 +14,9 @@ from urllib.parse import quote_plus, urlparse
 import google.generativeai as genai
 import requests
 from bs4 import BeautifulSoup
-from openai import OpenAI
 
 from config import DEFAULT_MODEL, USE_OPENAI_AS_PRIMARY, OPENAI_DEFAULT_MODEL
+from src.services import openai_chat
 
 logger = logging.getLogger(__name__)
 
@@ -252,30 +252,16 @@ def _configure_gemini() -> None:
     genai.configure(api_key=api_key)
 
 
-def _get_openai_client() -> OpenAI:
-    """Get or create OpenAI client."""
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY environment variable is required")
-    return OpenAI(api_key=api_key)
-
-
 def _call_openai_json(prompt: str, *, model: str = OPENAI_DEFAULT_MODEL) -> str:
     """Call OpenAI chat completion and return the response text."""
-    client = _get_openai_client()
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return openai_chat.json_completion(
+        model,
+        [
             {"role": "system", "content": "You are a concise assistant that returns strict JSON only."},
             {"role": "user", "content": prompt},
         ],
         temperature=0.4,
-        response_format={"type": "json_object"},
     )
-    content = response.choices[0].message.content
-    if not content:
-        raise RuntimeError("OpenAI response did not contain any content")
-    return content
 
 
 def extract_person_profile_from_web(
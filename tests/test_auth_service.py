@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import shutil
+
 import pytest
 
 from src.services.auth_service import (
@@ -9,6 +11,8 @@ from src.services.auth_service import (
     AuthError,
     AccountLockedError,
     EmailNotVerifiedError,
+    _LOCKOUT_COUNT_BY_IP_SQL,
+    _LOCKOUT_COUNT_SQL,
 )
 
 
@@ -97,6 +101,12 @@ def test_profile_persistence_roundtrip(tmp_path):
     assert loaded["sender_profile"]["name"] == "E"
     assert loaded["preferences"]["location"] == "NYC"
 
+    # Updating one blob leaves the other untouched.
+    service.update_user_profile(user_id=user_id, preferences={"track": "tech"})
+    loaded = service.get_user_profile(user_id)
+    assert loaded["sender_profile"]["name"] == "E"
+    assert loaded["preferences"] == {"track": "tech"}
+
 
 def test_waitlist_records_and_dedupes(tmp_path):
     service = AuthService(
@@ -178,3 +188,149 @@ def test_login_lockout_after_5_failures(tmp_path):
         email="lock@example.com", password="Secure123", ip="10.0.0.1"
     )
     assert user.primary_email == "lock@example.com"
+
+
+@pytest.mark.parametrize(
+    ("sql", "params"),
+    [
+        (_LOCKOUT_COUNT_SQL, ("a@example.com", "2026-01-01")),
+        (_LOCKOUT_COUNT_BY_IP_SQL, ("a@example.com", "127.0.0.1", "2026-01-01")),
+    ],
+)
+def test_lockout_query_uses_login_events_index(tmp_path, sql, params):
+    service = AuthService(
+        db_path=tmp_path / "app.db",
+        email_verify_ttl_hours=24,
+    )
+    with service._connect() as conn:
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    assert any("idx_login_events_email_created" in row[-1] for row in plan)
+
+
+# ============================================================================
+# Connection Pool Tests
+# ============================================================================
+
+
+def test_connections_are_reused_and_rolled_back_on_error(tmp_path):
+    """Pooled connections are handed out again and never leak an open transaction."""
+    service = AuthService(
+        db_path=tmp_path / "app.db",
+        email_verify_ttl_hours=24,
+    )
+    with service._connect() as first:
+        pass
+    with service._connect() as second:
+        pass
+    assert first is second
+
+    with pytest.raises(RuntimeError):
+        with service._connect() as conn:
+            conn.execute("INSERT INTO waitlist (id, email, created_at) VALUES ('w1', 'x@example.com', 'now')")
+            raise RuntimeError("boom")
+
+    with service._connect() as conn:
+        assert not conn.in_transaction
+        assert conn.execute("SELECT COUNT(*) FROM waitlist").fetchone()[0] == 0
+
+    service.close()
+    assert service._pool.empty()
+
+
+# ============================================================================
+# User Cache Tests
+# ============================================================================
+
+
+def test_get_user_cache_is_invalidated_on_login(tmp_path):
+    service = AuthService(
+        db_path=tmp_path / "app.db",
+        email_verify_ttl_hours=24,
+    )
+    user = service.authenticate_google(
+        google_sub="google-sub-cache",
+        email="cache@example.com",
+        display_name="Before",
+        avatar_url=None,
+        email_verified=True,
+    )
+    assert service.get_user(user.id).display_name == "Before"
+
+    service.authenticate_google(
+        google_sub="google-sub-cache",
+        email="cache@example.com",
+        display_name="After",
+        avatar_url=None,
+        email_verified=True,
+    )
+    assert service.get_user(user.id).display_name == "After"
+
+
+def test_get_user_during_login_transaction_does_not_cache_stale_row(tmp_path, monkeypatch):
+    """A get_user() that runs before the login commits must not pin the old row."""
+    service = AuthService(
+        db_path=tmp_path / "app.db",
+        email_verify_ttl_hours=24,
+    )
+    user = service.authenticate_google(
+        google_sub="google-sub-race",
+        email="race@example.com",
+        display_name="Before",
+        avatar_url=None,
+        email_verified=True,
+    )
+
+    seen = []
+    record_login_event = service._record_login_event
+
+    def record_and_read(conn, **kwargs):
+        # Runs inside the open write transaction, after the users UPDATE.
+        seen.append(service.get_user(user.id).display_name)
+        record_login_event(conn, **kwargs)
+
+    monkeypatch.setattr(service, "_record_login_event", record_and_read)
+    service.authenticate_google(
+        google_sub="google-sub-race",
+        email="race@example.com",
+        display_name="After",
+        avatar_url=None,
+        email_verified=True,
+    )
+
+    assert seen == ["Before"]
+    assert service.get_user(user.id).display_name == "After"
+
+    # A read that started before the invalidation must not be cached afterwards.
+    generation = service._user_cache_generation
+    service._invalidate_user(user.id)
+    service._cache_user(user, generation)
+    assert service._get_cached_user(user.id) is None
+
+
+# ============================================================================
+# Schema Migration Tests
+# ============================================================================
+
+
+def test_expired_verification_is_rejected_after_backfill(tmp_path):
+    db_path = tmp_path / "app.db"
+    service = AuthService(db_path=db_path, email_verify_ttl_hours=24)
+    verification = service.create_password_user(email="exp@example.com", password="password123")
+
+    # Simulate a row written before expires_at_ts existed.
+    with service._connect() as conn:
+        conn.execute(
+            "UPDATE email_verifications SET expires_at = ?, expires_at_ts = NULL",
+            ("2020-01-01T00:00:00.123456+00:00",),
+        )
+        conn.execute("PRAGMA user_version = 0")
+    service.close()
+
+    # Reopen under a new path so this process runs the schema check again.
+    reopened_path = tmp_path / "reopened.db"
+    shutil.copyfile(db_path, reopened_path)
+    service = AuthService(db_path=reopened_path, email_verify_ttl_hours=24)
+    with service._connect() as conn:
+        ts = conn.execute("SELECT expires_at_ts FROM email_verifications").fetchone()[0]
+    assert ts == 1577836800
+    assert service.verify_email_token(verification.token) is None
@@ -0,0 +1,29 @@
+"""Environment parsing helpers in config.py."""
+
+from __future__ import annotations
+
+import pytest
+
+import config
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("5", 5),
+        ("+5", 5),
+        ("-5", -5),
+        (" 12 ", 12),
+        ("--5", 24),
+        ("", 24),
+        ("abc", 24),
+    ],
+)
+def test_env_int_parses_or_falls_back(monkeypatch, raw, expected):
+    monkeypatch.setenv("EMAIL_VERIFY_TTL_HOURS", raw)
+    assert config._env_int("EMAIL_VERIFY_TTL_HOURS", 24) == expected
+
+
+def test_env_int_unset_uses_default(monkeypatch):
+    monkeypatch.delenv("EMAIL_VERIFY_TTL_HOURS", raising=False)
+    assert config._env_int("EMAIL_VERIFY_TTL_HOURS", 24) == 24
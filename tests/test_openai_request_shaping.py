@@ -0,0 +1,158 @@
+"""OpenAI request shaping tests (per-model parameter filtering)."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+
+import pytest
+
+import src.email_agent as email_agent
+from src.services import openai_chat
+
+
+@dataclass(slots=True)
+class _Msg:
+    content: str
+
+
+@dataclass(slots=True)
+class _Choice:
+    message: _Msg
+
+
+@dataclass(slots=True)
+class DummyResponse:
+    choices: list[_Choice]
+
+    @classmethod
+    def from_content(cls, content: str) -> DummyResponse:
+        return cls(choices=[_Choice(message=_Msg(content=content))])
+
+
+@dataclass(slots=True)
+class DummyChatCompletions:
+    """Returns canned contents in order and records the kwargs of each create()."""
+
+    results: deque[str]
+    calls: list[dict] = field(default_factory=list)
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return DummyResponse.from_content(self.results.popleft())
+
+
+@dataclass(slots=True)
+class _DummyChat:
+    completions: DummyChatCompletions
+
+
+class DummyClient:
+    """Stands in for ``openai.OpenAI``; only ``chat.completions.create`` is used."""
+
+    def __init__(self, results: list[str]):
+        self.chat = _DummyChat(DummyChatCompletions(deque(results)))
+
+
+@pytest.fixture
+def dummy_client(monkeypatch):
+    client = DummyClient(['{"ok": true}'])
+    monkeypatch.setattr(openai_chat, "get_client", lambda: client)
+    return client
+
+
+@pytest.mark.parametrize("model", ["o1-mini", "o3-mini", "o4-mini", "gpt-5-mini"])
+def test_reasoning_models_never_receive_temperature(dummy_client, model):
+    content = email_agent._call_openai_json("prompt", model=model)
+
+    assert content == '{"ok": true}'
+    assert len(dummy_client.chat.completions.calls) == 1
+    sent = dummy_client.chat.completions.calls[0]
+    assert sent["model"] == model
+    assert "temperature" not in sent
+
+
+def test_chat_models_keep_temperature_and_json_format(dummy_client):
+    email_agent._call_openai_json("prompt", model="gpt-4o")
+
+    sent = dummy_client.chat.completions.calls[0]
+    assert sent["temperature"] == 0.4
+    assert sent["response_format"] == {"type": "json_object"}
+
+
+def test_chat_path_shares_filtering_and_empty_content_check(monkeypatch):
+    client = DummyClient(["Hello", ""])
+    monkeypatch.setattr(openai_chat, "get_client", lambda: client)
+
+    assert email_agent._call_openai_chat("system", "user", model="gpt-5") == "Hello"
+    assert "temperature" not in client.chat.completions.calls[0]
+
+    with pytest.raises(RuntimeError):
+        email_agent._call_openai_chat("system", "user", model="gpt-4o")
+    assert client.chat.completions.calls[1]["temperature"] == 0.7
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '```json\n{"ok": true}\n```',
+        'Sure! {"ok": true} Let me know if you need more.',
+        '{"ok": true}',
+    ],
+)
+def test_extract_json_from_text_handles_fenced_and_bare_output(text):
+    assert openai_chat.extract_json_from_text(text) == '{"ok": true}'
+
+
+def test_models_without_json_mode_get_one_call_and_extracted_json(monkeypatch):
+    client = DummyClient(['```json\n{"ok": true}\n```'])
+    monkeypatch.setattr(openai_chat, "get_client", lambda: client)
+
+    content = email_agent._call_openai_json("prompt", model="o1-mini")
+
+    assert content == '{"ok": true}'
+    assert len(client.chat.completions.calls) == 1
+    sent = client.chat.completions.calls[0]
+    assert "temperature" not in sent
+    assert "response_format" not in sent
+    assert [m["role"] for m in sent["messages"]] == ["user"]
+    assert sent["messages"][0]["content"].startswith("You are a concise assistant")
+    assert sent["messages"][0]["content"].endswith("prompt")
+
+
+def test_o1_previews_get_no_tools_or_system_role_on_web_search(monkeypatch):
+    client = DummyClient(['{"ok": true}', '{"ok": true}'])
+    monkeypatch.setattr(openai_chat, "get_client", lambda: client)
+
+    email_agent._call_openai_json_with_web_search("prompt", model="o1-preview")
+    sent = client.chat.completions.calls[0]
+    assert "tools" not in sent
+    assert "tool_choice" not in sent
+    assert all(m["role"] != "system" for m in sent["messages"])
+
+    email_agent._call_openai_json_with_web_search("prompt", model="gpt-4o")
+    sent = client.chat.completions.calls[1]
+    assert sent["tools"] == [{"type": "web_search"}]
+    assert sent["messages"][0]["role"] == "system"
+
+
+def test_web_scraper_json_calls_share_the_filtered_path(dummy_client):
+    from src import web_scraper
+
+    assert web_scraper._call_openai_json("prompt", model="o3-mini") == '{"ok": true}'
+    assert "temperature" not in dummy_client.chat.completions.calls[0]
+
+
+def test_llm_service_openai_calls_use_the_shared_helper():
+    from src.services.llm_service import OpenAIService
+
+    client = DummyClient(['```json\n{"ok": true}\n```', '{"ok": true}'])
+    service = OpenAIService(model="o1-mini")
+    service._client = client
+
+    assert service.call("prompt", json_mode=True) == '{"ok": true}'
+    assert "response_format" not in client.chat.completions.calls[0]
+
+    service.model = "gpt-4o"
+    service.call("prompt", json_mode=True)
+    assert client.chat.completions.calls[1]["response_format"] == {"type": "json_object"}